@@ -0,0 +1,93 @@
+"""Agent runner: a long-lived, per-node server that runs agent sessions.
+
+Worker pods on the node connect over a Unix domain socket instead of
+starting their own interpreter and importing the SDK; the runner keeps
+those warm across sessions. Each session still gets its own
+'claude mcp serve', spawned by the CLI in that session's worktree, so
+concurrent sessions never share tools or a working directory.
+
+Anyone who can connect to the socket runs bypassPermissions sessions
+under the runner's API key, so it is created owner-only (0600) for the
+agent user, and the orchestrator mounts its directory into worker pods
+only when AGENT_RUNNER_ENABLED is set.
+
+Protocol (one JSON object per line):
+  client -> runner : {"prompt", "agent_id", "group_id", "branch", "worktree_path",
+                      "batch_mode", "quiet"}
+  runner -> client : {"out": "<log text>"} ... {"err": "<message>"} ... {"exit": <status>}
+"""
+
+import asyncio
+import json
+import os
+
+from worker import AgentEnv, run_agent
+
+AGENT_RUNNER_SOCKET = os.environ.get(
+    "AGENT_RUNNER_SOCKET", "/var/run/agent-runner/agent.sock"
+)
+# Requests carry the full prompt on a single line
+REQUEST_LIMIT = 16 * 1024 * 1024
+
+
+class _SocketOutput:
+    """Buffers log text and sends it to the client as one frame per flush()."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self._writer = writer
+        self._buf: list[str] = []
+
+    def write(self, s: str, /) -> int:
+        self._buf.append(s)
+        return len(s)
+
+    def flush(self) -> None:
+        if self._buf:
+            self.send({"out": "".join(self._buf)})
+            self._buf.clear()
+
+    def send(self, frame: dict[str, object]) -> None:
+        self._writer.write(json.dumps(frame).encode() + b"\n")
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    out = _SocketOutput(writer)
+    status = 1
+    agent_id = "?"
+    try:
+        env = AgentEnv(**json.loads(await reader.readline()))
+        agent_id = env.agent_id
+        if await run_agent(env, out, writer.drain):
+            status = 0
+    except Exception as e:
+        out.flush()
+        out.send({"err": f"[Agent {agent_id}] ERROR: {e}"})
+    finally:
+        out.flush()
+        out.send({"exit": status})
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def main() -> None:
+    os.makedirs(os.path.dirname(AGENT_RUNNER_SOCKET), exist_ok=True)
+    if os.path.exists(AGENT_RUNNER_SOCKET):
+        os.unlink(AGENT_RUNNER_SOCKET)
+    server = await asyncio.start_unix_server(
+        _handle, path=AGENT_RUNNER_SOCKET, limit=REQUEST_LIMIT
+    )
+    os.chmod(AGENT_RUNNER_SOCKET, 0o600)
+    print(f"Agent runner listening on {AGENT_RUNNER_SOCKET}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -0,0 +1,53 @@
+"""Build-time smoke test for the mypyc-compiled worker.
+
+Imports the compiled extension and drives run_agent() through a stub
+query(), so a miscompiled module fails the image build instead of every
+agent at runtime.
+"""
+
+import asyncio
+import io
+import sys
+from collections.abc import AsyncIterator
+from typing import Any
+
+from claude_agent_sdk import AssistantMessage, Message, ResultMessage, TextBlock
+
+import worker
+
+
+async def _stub_query(*, prompt: str, options: Any) -> AsyncIterator[Message]:
+    yield AssistantMessage(content=[TextBlock(text="smoke")], model="stub")
+    is_error = prompt == "fail"
+    yield ResultMessage(
+        subtype="error_during_execution" if is_error else "success",
+        duration_ms=1,
+        duration_api_ms=1,
+        is_error=is_error,
+        num_turns=1,
+        session_id="smoke",
+        total_cost_usd=0.0,
+        result="smoke result",
+    )
+
+
+def main() -> None:
+    if not worker.__file__ or worker.__file__.endswith(".py"):
+        sys.exit(f"expected the compiled worker, imported {worker.__file__}")
+    # limited_query() looks query() up as a module global at call time
+    setattr(worker, "query", _stub_query)
+    out = io.StringIO()
+    env = worker.AgentEnv("smoke", "0", "smoke", "", "/tmp")
+    if not asyncio.run(worker.run_agent(env, out)):
+        sys.exit("run_agent() reported failure")
+    log = out.getvalue()
+    if "smoke result" not in log or "[Agent 0] smoke" not in log:
+        sys.exit(f"unexpected log:\n{log}")
+    env = worker.AgentEnv("fail", "0", "smoke", "", "/tmp")
+    if asyncio.run(worker.run_agent(env, io.StringIO())):
+        sys.exit("run_agent() reported success for an error result")
+    print("mypyc smoke test passed")
+
+
+if __name__ == "__main__":
+    main()
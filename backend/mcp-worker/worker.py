@@ -7,67 +7,575 @@ Each worker pod receives:
   - AGENT_BRANCH          : git branch assigned to this agent
   - AGENT_WORKTREE_PATH   : path to the git worktree for this agent
 
+Optional:
+  - SEMANTIC_CACHE_DB     : SQLite file enabling the semantic prompt cache
+  - OLLAMA_URL            : Ollama server used to embed prompts for the cache
+  - AGENT_BATCH_MODE      : "1" to answer via the Message Batches API instead
+                            of a live agent session (no tools, no commit)
+  - AGENT_QUIET           : "1" to log only the final result, not the stream
+
 The worker uses the worktree as its working directory and appends
 instructions to the system prompt so the agent commits all changes to
 its assigned branch as the final step.
 """
 
+import array
 import asyncio
+import atexit
+import io
+import json
+import math
 import os
+import sqlite3
 import sys
+import time
+import urllib.request
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Protocol
 
 from claude_agent_sdk import (
     query,
     ClaudeAgentOptions,
+    McpServerConfig,
+    Message,
     ResultMessage,
     AssistantMessage,
     TextBlock,
     ToolUseBlock,
 )
 
+# The CLI spawns 'claude mcp serve' for each session with the session's cwd,
+# so its tools run inside the agent's worktree.
+MCP_SERVER_CONFIG: McpServerConfig = {"command": "claude", "args": ["mcp", "serve"]}
+
+
+SEMANTIC_CACHE_DB = os.environ.get("SEMANTIC_CACHE_DB", "")
+OLLAMA_URL = os.environ.get(
+    "OLLAMA_URL", "http://ollama.backend.svc.cluster.local:11434"
+)
+SEMANTIC_CACHE_MODEL = os.environ.get("SEMANTIC_CACHE_MODEL", "nomic-embed-text")
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+SEMANTIC_CACHE_TTL = int(os.environ.get("SEMANTIC_CACHE_TTL", "3600"))
+
+
+class SemanticPromptCache:
+    """Results of earlier queries in a job group, keyed by prompt embedding.
+
+    Prompts are embedded by an Ollama server and rows live in a SQLite
+    table on the shared volume. A group only ever holds a handful of rows,
+    so lookups compare cosine similarity in Python rather than loading a
+    vector extension.
+
+    A hit replays the stored result without running the agent, so nothing
+    is committed to the agent's branch; enable it only for prompts whose
+    answer is the result text itself.
+    """
+
+    def __init__(self, path: str, group_id: str):
+        self.group_id = group_id
+        # Opened and written from different worker threads (asyncio.to_thread)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prompt_cache ("
+            " group_id TEXT NOT NULL,"
+            " prompt TEXT NOT NULL,"
+            " result_text TEXT NOT NULL,"
+            " embedding BLOB NOT NULL,"
+            " cost REAL,"
+            " duration_ms INTEGER,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS prompt_cache_group"
+            " ON prompt_cache (group_id, expires_at)"
+        )
+        self._conn.commit()
+
+    def embed(self, text: str) -> list[float] | None:
+        """Embed text with Ollama, or return None if the server is unavailable."""
+        body = json.dumps({"model": SEMANTIC_CACHE_MODEL, "prompt": text}).encode()
+        req = urllib.request.Request(
+            f"{OLLAMA_URL}/api/embeddings",
+            data=body,
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                embedding: list[float] = json.load(resp)["embedding"]
+                return embedding
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Semantic cache: embedding failed: {e}", file=sys.stderr)
+            return None
+
+    def lookup(self, embedding: list[float]) -> dict[str, Any] | None:
+        """Return the closest unexpired result above the similarity threshold."""
+        rows = self._conn.execute(
+            "SELECT result_text, embedding, cost, duration_ms FROM prompt_cache"
+            " WHERE group_id = ? AND expires_at > ?",
+            (self.group_id, time.time()),
+        ).fetchall()
+        best, best_score = None, SEMANTIC_CACHE_THRESHOLD
+        for result_text, blob, cost, duration_ms in rows:
+            score = _cosine(embedding, array.array("f", blob))
+            if score > best_score:
+                best_score = score
+                best = {
+                    "result_text": result_text,
+                    "cost": cost,
+                    "duration_ms": duration_ms,
+                }
+        return best
+
+    def store(
+        self,
+        prompt: str,
+        embedding: list[float],
+        result_text: str,
+        cost: float | None,
+        duration_ms: int | None,
+    ) -> None:
+        """Store a result; a SQLite failure only costs the cache entry."""
+        try:
+            self._conn.execute(
+                "INSERT INTO prompt_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.group_id,
+                    prompt,
+                    result_text,
+                    array.array("f", embedding).tobytes(),
+                    cost,
+                    duration_ms,
+                    time.time() + SEMANTIC_CACHE_TTL,
+                ),
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Semantic cache: store failed: {e}", file=sys.stderr)
+
+
+def open_and_lookup(
+    group_id: str, prompt: str
+) -> tuple[SemanticPromptCache | None, list[float] | None, dict[str, Any] | None]:
+    """Open the cache and look up the prompt; blocking, so run it in a thread.
+
+    Any SQLite failure is treated as a miss with no cache to store into.
+    """
+    try:
+        cache = SemanticPromptCache(SEMANTIC_CACHE_DB, group_id)
+        embedding = cache.embed(prompt)
+        return cache, embedding, cache.lookup(embedding) if embedding else None
+    except sqlite3.Error as e:
+        print(f"Semantic cache: unavailable: {e}", file=sys.stderr)
+        return None, None, None
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+AGENT_INSTRUCTIONS_TMPL = (
+    "You are autonomous agent #{agent_id} in a group of agents. "
+    "Complete the given task independently and thoroughly. "
+    "Provide detailed results when finished."
+)
+
+COMMIT_INSTRUCTIONS_TMPL = (
+    "\n\n--- GIT WORKFLOW INSTRUCTIONS ---\n"
+    "You are working inside a git worktree on branch '{branch}'.\n"
+    "Your working directory is already set to this worktree.\n"
+    "IMPORTANT: As your VERY LAST step, after all other work is complete, you MUST:\n"
+    "  1. Run `git add -A` to stage every file you created or changed.\n"
+    '  2. Run `git commit -m "Agent work: <short summary of what you did>"` '
+    "to commit all changes.\n"
+    "Do NOT push. Do NOT switch branches. Just add and commit.\n"
+    "--- END GIT WORKFLOW INSTRUCTIONS ---\n"
+)
+
+# Concatenated once at import time, so a call makes a single format pass.
+_AGENT_WITH_COMMIT_TMPL = AGENT_INSTRUCTIONS_TMPL + COMMIT_INSTRUCTIONS_TMPL
+
+
+def build_system_prompt_append(agent_id: str, branch: str) -> str:
+    """Return the system-prompt appendix for one agent."""
+    if branch:
+        return _AGENT_WITH_COMMIT_TMPL.format(agent_id=agent_id, branch=branch)
+    return AGENT_INSTRUCTIONS_TMPL.format(agent_id=agent_id)
+
+
+AGENT_BATCH_MODEL = os.environ.get("AGENT_BATCH_MODEL", "claude-sonnet-4-5")
+AGENT_BATCH_MAX_TOKENS = int(os.environ.get("AGENT_BATCH_MAX_TOKENS", "8192"))
+AGENT_BATCH_POLL_MAX = 60.0
+
 
-def build_commit_instructions(branch: str) -> str:
-    """Return the system-prompt appendix that tells the agent to commit."""
-    return (
-        "\n\n--- GIT WORKFLOW INSTRUCTIONS ---\n"
-        f"You are working inside a git worktree on branch '{branch}'.\n"
-        "Your working directory is already set to this worktree.\n"
-        "IMPORTANT: As your VERY LAST step, after all other work is complete, you MUST:\n"
-        "  1. Run `git add -A` to stage every file you created or changed.\n"
-        f'  2. Run `git commit -m "Agent work: <short summary of what you did>"` '
-        "to commit all changes.\n"
-        "Do NOT push. Do NOT switch branches. Just add and commit.\n"
-        "--- END GIT WORKFLOW INSTRUCTIONS ---\n"
+async def _run_batched(
+    prompt: str, agent_id: str, group_id: str
+) -> dict[str, Any]:
+    """Answer the prompt through the Message Batches API and poll until done.
+
+    Batches are billed at half price but run asynchronously and without
+    tools, so this suits latency-tolerant, answer-only prompts. Each agent
+    pod submits its own one-request batch and stays up polling it, which
+    can take up to 24 hours; the orchestrator gives batch-mode pods a
+    small resource request for that reason.
+    """
+    import anthropic
+
+    client = anthropic.AsyncAnthropic()
+    batch = await client.messages.batches.create(
+        requests=[
+            {
+                "custom_id": f"{group_id}-{agent_id}",
+                "params": {
+                    "model": AGENT_BATCH_MODEL,
+                    "max_tokens": AGENT_BATCH_MAX_TOKENS,
+                    "system": AGENT_INSTRUCTIONS_TMPL.format(agent_id=agent_id),
+                    "messages": [{"role": "user", "content": prompt}],
+                },
+            }
+        ]
     )
+    print(f"[Agent {agent_id}] Submitted batch {batch.id}")
 
+    started = time.monotonic()
+    delay = 1.0
+    while batch.processing_status != "ended":
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, AGENT_BATCH_POLL_MAX)
+        batch = await client.messages.batches.retrieve(batch.id)
 
-async def main():
-    prompt = os.environ.get("AGENT_PROMPT", "")
-    agent_id = os.environ.get("AGENT_ID", "0")
-    group_id = os.environ.get("JOB_GROUP_ID", "unknown")
-    branch = os.environ.get("AGENT_BRANCH", "")
-    worktree_path = os.environ.get("AGENT_WORKTREE_PATH", "")
+    async for entry in await client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            return {
+                "result_text": f"Batch request {entry.result.type}",
+                "duration_ms": int((time.monotonic() - started) * 1000),
+                "is_error": True,
+            }
+        text = "".join(
+            block.text for block in entry.result.message.content if block.type == "text"
+        )
+        return {
+            "result_text": text,
+            "duration_ms": int((time.monotonic() - started) * 1000),
+            "is_error": False,
+        }
+    return {"result_text": "Batch returned no results", "duration_ms": None, "is_error": True}
 
-    if not prompt:
-        print("ERROR: No prompt provided via AGENT_PROMPT env var", file=sys.stderr)
-        sys.exit(1)
+
+# Per-process limits. A worker pod runs a single query(), so they only take
+# effect in the agent runner, which serves every session on its node from
+# one process. They do not coordinate across pods or nodes.
+AGENT_MAX_CONCURRENCY = int(os.environ.get("AGENT_MAX_CONCURRENCY", "8"))
+AGENT_MAX_RPM = float(os.environ.get("AGENT_MAX_RPM", "0"))
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per `period` seconds."""
+
+    def __init__(self, rate: float, period: float = 60.0):
+        self.rate = rate
+        self.period = period
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate,
+                    self._tokens + (now - self._updated) * self.rate / self.period,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+
+_QUERY_SEM = asyncio.Semaphore(AGENT_MAX_CONCURRENCY)
+_QUERY_LIMITER = RateLimiter(AGENT_MAX_RPM)
+
+
+async def limited_query(
+    prompt: str,
+    options: ClaudeAgentOptions,
+    on_message: Callable[[Message], Awaitable[None]],
+) -> None:
+    """Run query() under the concurrency cap and RPM limit.
+
+    The RPM limit gates session starts, not the API calls the CLI makes
+    within a session. Each streamed message is passed to on_message. API errors, rate limits
+    included, arrive as an error ResultMessage and are reported as such.
+    """
+    async with _QUERY_SEM:
+        await _QUERY_LIMITER.acquire()
+        async for message in query(prompt=prompt, options=options):
+            await on_message(message)
+
+
+STDOUT_BUFFER_SIZE = 64 * 1024
+STDOUT_FLUSH_EVERY = 32
+
+
+def buffer_stdout() -> None:
+    """Replace line-buffered stdout with a block-buffered writer.
+
+    Log lines then coalesce into one write() per buffer instead of one per
+    print(); main() flushes explicitly at result boundaries.
+    """
+    sys.stdout.flush()
+    sys.stdout = io.TextIOWrapper(
+        open(sys.stdout.fileno(), "wb", buffering=STDOUT_BUFFER_SIZE, closefd=False),
+        write_through=False,
+        line_buffering=False,
+    )
+    atexit.register(sys.stdout.flush)
+
+
+RESULT_CHUNK_CHARS = 8192
+RESULT_YIELD_EVERY = 8
+
+_BAR = "=" * 60
+_RESULT_HEADER_TMPL = f"\n{_BAR}\nAGENT {{agent_id}} RESULT\n{_BAR}\n"
+_RESULT_FOOTER = f"\n{_BAR}\n"
+
+
+class Output(Protocol):
+    """Text sink for agent logs: buffered stdout, or a runner client socket."""
+
+    def write(self, s: str, /) -> int: ...
+
+    def flush(self) -> None: ...
+
+
+async def print_result(
+    out: Output,
+    agent_id: str,
+    result_text: str,
+    cost: float | None,
+    duration_ms: int | None,
+    is_error: bool = False,
+) -> None:
+    """Print the framed final result of an agent run.
+
+    Large results are written in chunks, so only one chunk at a time is
+    encoded. The loop is yielded to periodically so the MCP relay keeps
+    draining while a long result is written out.
+    """
+    write = out.write
+    write(_RESULT_HEADER_TMPL.format(agent_id=agent_id))
+    for n, i in enumerate(range(0, len(result_text), RESULT_CHUNK_CHARS), 1):
+        write(result_text[i : i + RESULT_CHUNK_CHARS])
+        if n % RESULT_YIELD_EVERY == 0:
+            await asyncio.sleep(0)
+    write(_RESULT_FOOTER)
+    if cost is not None:
+        print(f"Cost: ${cost:.4f}", file=out)
+    if duration_ms is not None:
+        print(f"Duration: {duration_ms}ms", file=out)
+    if is_error:
+        print(f"Error: {is_error}", file=out)
+
+
+@dataclass(slots=True, frozen=True)
+class AgentEnv:
+    """Per-agent settings, read from the environment once at startup.
+
+    The agent runner builds one per session from the client's request.
+    """
+
+    prompt: str
+    agent_id: str
+    group_id: str
+    branch: str
+    worktree_path: str
+    batch_mode: bool = False
+    quiet: bool = False
+
+    @classmethod
+    def from_env(cls) -> "AgentEnv":
+        environ = os.environ
+        return cls(
+            prompt=environ.get("AGENT_PROMPT", ""),
+            agent_id=environ.get("AGENT_ID", "0"),
+            group_id=environ.get("JOB_GROUP_ID", "unknown"),
+            branch=environ.get("AGENT_BRANCH", ""),
+            worktree_path=environ.get("AGENT_WORKTREE_PATH", ""),
+            batch_mode=environ.get("AGENT_BATCH_MODE") == "1",
+            quiet=environ.get("AGENT_QUIET") == "1",
+        )
+
+
+# ---------------------------------------------------------------------------
+# Message handlers, dispatched on exact type to keep the stream loop cheap
+# ---------------------------------------------------------------------------
+
+TEXT_PREVIEW_CHARS = 300
+
+
+def _on_assistant(message: AssistantMessage, agent_id: str, out: Output) -> None:
+    """Log a message's text blocks as one capped line, then its tool calls."""
+    preview: list[str] = []
+    remaining = TEXT_PREVIEW_CHARS
+    tools: list[str] = []
+    for block in message.content:
+        if type(block) is TextBlock:
+            text = block.text
+            if len(text) > remaining:
+                text = text[:remaining]
+            preview.append(text)
+            remaining -= len(text)
+        elif type(block) is ToolUseBlock:
+            tools.append(block.name)
+    write = out.write
+    if preview:
+        # Write the pieces straight into the buffered output rather than
+        # formatting a combined copy of the text first.
+        write(f"[Agent {agent_id}] ")
+        for text in preview:
+            write(text)
+        write("\n")
+    for name in tools:
+        write(f"[Agent {agent_id}] Using tool: {name}\n")
+
+
+_Handler = Callable[[Any, str, Output], None]
+
+# ResultMessage is handled inline in run_agent() since writing it is awaited.
+_MSG_HANDLERS: dict[type, _Handler] = {AssistantMessage: _on_assistant}
+
+
+class _MessageSink:
+    """Logs one session's streamed messages and stores its result in the cache.
+
+    A class rather than a nested async function, whose closure does not
+    survive mypyc compilation. ``ok`` turns False if the session ends in an
+    error result.
+    """
+
+    def __init__(
+        self,
+        env: AgentEnv,
+        out: Output,
+        cache: SemanticPromptCache | None,
+        embedding: list[float] | None,
+        drain: Callable[[], Awaitable[None]] | None,
+    ):
+        self.env = env
+        self.out = out
+        self.cache = cache
+        self.embedding = embedding
+        self.drain = drain
+        self.count = 0
+        self.ok = True
+
+    async def _flush(self) -> None:
+        self.out.flush()
+        if self.drain is not None:
+            await self.drain()
+
+    async def __call__(self, message: Message) -> None:
+        env = self.env
+        out = self.out
+        if not isinstance(message, ResultMessage):
+            if env.quiet:
+                return
+            self.count += 1
+            handler = _MSG_HANDLERS.get(type(message))
+            if handler is not None:
+                handler(message, env.agent_id, out)
+            if self.count % STDOUT_FLUSH_EVERY == 0:
+                await self._flush()
+            return
+
+        result_text = message.result or ""
+        await print_result(
+            out,
+            env.agent_id,
+            result_text,
+            message.total_cost_usd,
+            message.duration_ms,
+            message.is_error,
+        )
+        # Keep the result frame together in the log
+        await self._flush()
+        self.ok = not message.is_error
+        if self.cache is not None and self.embedding and not message.is_error:
+            await asyncio.to_thread(
+                self.cache.store,
+                env.prompt,
+                self.embedding,
+                result_text,
+                message.total_cost_usd,
+                message.duration_ms,
+            )
+
+
+async def run_agent(
+    env: AgentEnv,
+    out: Output,
+    drain: Callable[[], Awaitable[None]] | None = None,
+) -> bool:
+    """Run one agent session, writing its log to `out`.
+
+    `drain`, if given, is awaited after each flush of `out` so a slow
+    reader applies backpressure. Returns False if the agent reported an
+    error; SDK failures propagate.
+    """
+    prompt = env.prompt
+    agent_id = env.agent_id
+    group_id = env.group_id
+    branch = env.branch
 
     # Fall back to a generic workspace when no worktree is provided
-    cwd = worktree_path if worktree_path else "/home/agent/workspace"
+    cwd = env.worktree_path if env.worktree_path else "/home/agent/workspace"
+
+    print(f"[Agent {agent_id}] Starting (group={group_id})", file=out)
+    print(f"[Agent {agent_id}] Branch: {branch}", file=out)
+    print(f"[Agent {agent_id}] Worktree: {cwd}", file=out)
+    print(
+        f"[Agent {agent_id}] Prompt: {prompt[:200]}{'...' if len(prompt) > 200 else ''}",
+        file=out,
+    )
 
-    print(f"[Agent {agent_id}] Starting (group={group_id})")
-    print(f"[Agent {agent_id}] Branch: {branch}")
-    print(f"[Agent {agent_id}] Worktree: {cwd}")
-    print(f"[Agent {agent_id}] Prompt: {prompt[:200]}{'...' if len(prompt) > 200 else ''}")
+    # Replay a sibling agent's result for a near-identical prompt, if cached
+    cache = None
+    embedding = None
+    if SEMANTIC_CACHE_DB:
+        # The lookup blocks on SQLite and an Ollama round trip
+        cache, embedding, hit = await asyncio.to_thread(
+            open_and_lookup, group_id, prompt
+        )
+        if hit:
+            print(f"[Agent {agent_id}] Semantic cache hit; skipping query", file=out)
+            await print_result(
+                out, agent_id, hit["result_text"], hit["cost"], hit["duration_ms"]
+            )
+            return True
+
+    if env.batch_mode:
+        batched = await _run_batched(prompt, agent_id, group_id)
+        await print_result(
+            out,
+            agent_id,
+            batched["result_text"],
+            None,
+            batched["duration_ms"],
+            batched["is_error"],
+        )
+        if batched["is_error"]:
+            return False
+        print(f"[Agent {agent_id}] Completed successfully", file=out)
+        return True
 
     # Build the system prompt appendix
-    agent_instructions = (
-        f"You are autonomous agent #{agent_id} in a group of agents. "
-        "Complete the given task independently and thoroughly. "
-        "Provide detailed results when finished."
-    )
-    if branch:
-        agent_instructions += build_commit_instructions(branch)
+    agent_instructions = build_system_prompt_append(agent_id, branch)
 
     # Configure the Claude Agent SDK with 'claude mcp serve' as an STDIO MCP server.
     options = ClaudeAgentOptions(
@@ -76,46 +584,52 @@ async def main():
             "preset": "claude_code",
             "append": agent_instructions,
         },
-        mcp_servers={
-            "claude-code": {
-                "command": "claude",
-                "args": ["mcp", "serve"],
-            }
-        },
+        mcp_servers={"claude-code": MCP_SERVER_CONFIG},
         allowed_tools=["mcp__claude-code__*"],
         permission_mode="bypassPermissions",
         max_turns=50,
         cwd=cwd,
     )
 
-    result_text = ""
+    on_message = _MessageSink(env, out, cache, embedding, drain)
+    await limited_query(prompt, options, on_message)
+    if not on_message.ok:
+        return False
+    print(f"[Agent {agent_id}] Completed successfully", file=out)
+    return True
+
+
+async def main() -> None:
+    buffer_stdout()
+    env = AgentEnv.from_env()
+
+    if not env.prompt:
+        sys.stdout.flush()
+        print("ERROR: No prompt provided via AGENT_PROMPT env var", file=sys.stderr)
+        sys.exit(1)
+
     try:
-        async for message in query(prompt=prompt, options=options):
-            if isinstance(message, ResultMessage):
-                result_text = message.result or ""
-                print(f"\n{'='*60}")
-                print(f"AGENT {agent_id} RESULT")
-                print(f"{'='*60}")
-                print(result_text)
-                print(f"{'='*60}")
-                if message.total_cost_usd is not None:
-                    print(f"Cost: ${message.total_cost_usd:.4f}")
-                if message.duration_ms is not None:
-                    print(f"Duration: {message.duration_ms}ms")
-                if message.is_error:
-                    print(f"Error: {message.is_error}")
-            elif isinstance(message, AssistantMessage):
-                for block in message.content:
-                    if isinstance(block, TextBlock):
-                        print(f"[Agent {agent_id}] {block.text[:300]}")
-                    elif isinstance(block, ToolUseBlock):
-                        print(f"[Agent {agent_id}] Using tool: {block.name}")
+        ok = await run_agent(env, sys.stdout)
     except Exception as e:
-        print(f"[Agent {agent_id}] ERROR: {e}", file=sys.stderr)
+        sys.stdout.flush()
+        print(f"[Agent {env.agent_id}] ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if not ok:
         sys.exit(1)
 
-    print(f"[Agent {agent_id}] Completed successfully")
+
+def run() -> None:
+    """Run main() to completion on the fastest available event loop."""
+    # uvloop speeds up the pipe and socket I/O behind the MCP stream;
+    # fall back to the stock event loop where it is unavailable.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
@@ -0,0 +1,76 @@
+"""Container entry point for the MCP worker.
+
+When the node's agent runner is reachable on AGENT_RUNNER_SOCKET, this is
+a thin client: it sends the agent's settings to the runner and relays the
+session log to stdout. Otherwise it runs the agent in-process.
+
+Importing `worker` picks up the mypyc-compiled extension when the image
+ships one, and falls back to worker.py otherwise. The environment is
+checked first so a misconfigured pod exits before loading the SDK.
+"""
+
+import json
+import os
+import socket
+import sys
+
+AGENT_RUNNER_SOCKET = os.environ.get("AGENT_RUNNER_SOCKET", "")
+
+
+def _validate_env() -> bool:
+    if not os.environ.get("AGENT_PROMPT"):
+        print("ERROR: No prompt provided via AGENT_PROMPT env var", file=sys.stderr)
+        return False
+    return True
+
+
+def _connect_runner(path: str) -> socket.socket | None:
+    """Connect to the agent runner, or return None if it is not running."""
+    if not path or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _run_via_runner(sock: socket.socket) -> int:
+    """Run the session on the agent runner and return its exit status."""
+    request = {
+        "prompt": os.environ.get("AGENT_PROMPT", ""),
+        "agent_id": os.environ.get("AGENT_ID", "0"),
+        "group_id": os.environ.get("JOB_GROUP_ID", "unknown"),
+        "branch": os.environ.get("AGENT_BRANCH", ""),
+        "worktree_path": os.environ.get("AGENT_WORKTREE_PATH", ""),
+        "batch_mode": os.environ.get("AGENT_BATCH_MODE") == "1",
+        "quiet": os.environ.get("AGENT_QUIET") == "1",
+    }
+    with sock:
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        for line in sock.makefile("rb"):
+            frame = json.loads(line)
+            if "out" in frame:
+                sys.stdout.write(frame["out"])
+                sys.stdout.flush()
+            elif "err" in frame:
+                print(frame["err"], file=sys.stderr)
+            elif "exit" in frame:
+                return int(frame["exit"])
+    print("ERROR: agent runner closed the connection", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    if not _validate_env():
+        sys.exit(1)
+
+    runner = _connect_runner(AGENT_RUNNER_SOCKET)
+    if runner is not None:
+        sys.exit(_run_via_runner(runner))
+
+    from worker import run
+
+    run()
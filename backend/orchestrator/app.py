@@ -1,24 +1,42 @@
+import asyncio
+import copy
 import logging
 import os
+import secrets
 import subprocess
-import uuid
-
-from fastapi import FastAPI, HTTPException
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+from fastapi import BackgroundTasks, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from kubernetes import client, config
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from kubernetes import client, config, watch
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+try:
+    import pygit2
+except ImportError:  # fall back to the git CLI
+    pygit2 = None
 
 logger = logging.getLogger("orchestrator")
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="Multi-Agent Orchestrator")
+app = FastAPI(title="Multi-Agent Orchestrator", default_response_class=ORJSONResponse)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Browsers reach the orchestrator only through the frontend's same-origin
+# proxy, so CORS is opt-in (e.g. for calling the API directly in development)
+if os.environ.get("ENABLE_CORS") == "1":
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 # Load Kubernetes configuration
 try:
@@ -26,28 +44,59 @@ try:
 except config.ConfigException:
     config.load_kube_config()
 
-batch_v1 = client.BatchV1Api()
-core_v1 = client.CoreV1Api()
+# One shared ApiClient whose connection pool is large enough for the calls
+# issued concurrently via asyncio.to_thread (the default pool holds 4)
+K8S_POOL_MAXSIZE = 32
+_k8s_config = client.Configuration.get_default_copy()
+_k8s_config.connection_pool_maxsize = K8S_POOL_MAXSIZE
+api_client = client.ApiClient(configuration=_k8s_config)
+batch_v1 = client.BatchV1Api(api_client)
+core_v1 = client.CoreV1Api(api_client)
 
 MCP_WORKER_IMAGE = os.environ.get("MCP_WORKER_IMAGE", "mcp-worker:latest")
 NAMESPACE = "backend"
 OUTPUT_BASE = "/mnt/claude-output"
+GIT_USER_EMAIL = "agent@claude.local"
+GIT_USER_NAME = "Claude Agent"
+# Opt-in: mounting the runner's hostPath socket lets a worker pod run
+# sessions under the runner's API key, so it is off unless the DaemonSet
+# is deployed on purpose.
+AGENT_RUNNER_ENABLED = os.environ.get("AGENT_RUNNER_ENABLED") == "1"
+AGENT_RUNNER_DIR = "/var/run/agent-runner"
+# Passed to worker pods to enable their semantic prompt cache: a SQLite file
+# on the shared volume, and the Ollama server that embeds prompts (the
+# worker's default is used when OLLAMA_URL is unset)
+SEMANTIC_CACHE_DB = os.environ.get("SEMANTIC_CACHE_DB", "")
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "")
+# Longest accepted prompt; it travels in the Job manifest as an env var
+MAX_PROMPT_LENGTH = 64_000
+# Optional bare repo whose objects every run repo borrows via alternates
+SHARED_OBJECTS_REPO = os.path.join(OUTPUT_BASE, "shared-objects.git")
 
 
 class RunRequest(BaseModel):
-    prompt: str
+    prompt: str = Field(max_length=MAX_PROMPT_LENGTH)
     num_agents: int = 1
+    batch_mode: bool = False
+    quiet: bool = False
 
 
 # ---------------------------------------------------------------------------
 # Git helpers
 # ---------------------------------------------------------------------------
 
-def _run_git(args: list[str], cwd: str | None = None) -> str:
-    """Run a git command and return stdout."""
+# Errors setup_run_repo() may raise from either git backend
+GIT_ERRORS: tuple[type[Exception], ...] = (subprocess.CalledProcessError,)
+if pygit2 is not None:
+    GIT_ERRORS += (pygit2.GitError,)
+
+
+def _run_git(args: list[str], cwd: str | None = None, input: str | None = None) -> str:
+    """Run a git command and return stdout (fallback when pygit2 is missing)."""
     result = subprocess.run(
         ["git"] + args,
         cwd=cwd,
+        input=input,
         capture_output=True,
         text=True,
         check=True,
@@ -55,6 +104,10 @@ def _run_git(args: list[str], cwd: str | None = None) -> str:
     return result.stdout.strip()
 
 
+def _run_dir(group_id: str) -> str:
+    return os.path.join(OUTPUT_BASE, f"run-{group_id}")
+
+
 def setup_run_repo(group_id: str, num_agents: int) -> list[dict]:
     """Create a run directory, init a git repo, and create one worktree per agent.
 
@@ -67,41 +120,121 @@ def setup_run_repo(group_id: str, num_agents: int) -> list[dict]:
 
     Returns a list of dicts with agent_id, branch, and worktree_path.
     """
-    run_dir = os.path.join(OUTPUT_BASE, f"run-{group_id}")
+    run_dir = _run_dir(group_id)
     repo_dir = os.path.join(run_dir, "repo")
     os.makedirs(repo_dir, exist_ok=True)
 
-    # 1. Init the repository
-    _run_git(["init"], cwd=repo_dir)
-    _run_git(["config", "user.email", "agent@claude.local"], cwd=repo_dir)
-    _run_git(["config", "user.name", "Claude Agent"], cwd=repo_dir)
-
-    # 2. Create an initial commit so branches can be created
-    readme_path = os.path.join(repo_dir, "README.md")
-    with open(readme_path, "w") as f:
-        f.write(f"# Run {group_id}\n\nMulti-agent Claude MCP run.\n")
-    _run_git(["add", "."], cwd=repo_dir)
-    _run_git(["commit", "-m", "Initial commit"], cwd=repo_dir)
-
-    # 3. Create a worktree + branch per agent
-    worktrees: list[dict] = []
-    for i in range(num_agents):
+    readme = f"# Run {group_id}\n\nMulti-agent Claude MCP run.\n"
+    repo = None
+    if pygit2 is not None:
+        repo = _init_repo_libgit2(repo_dir, readme)
+    else:
+        _init_repo_cli(repo_dir, readme)
+
+    # Create a worktree + branch per agent. The checkouts are independent
+    # filesystem work, so they run in parallel.
+    if repo is not None:
+        # libgit2 ref writes are not safe to run concurrently; create the
+        # branches up front and only check out worktrees in parallel.
+        head = repo.head.peel(pygit2.Commit)
+        for i in range(num_agents):
+            repo.branches.local.create(f"agent-{i}", head)
+
+    def create_worktree(i: int) -> dict:
         branch_name = f"agent-{i}"
         worktree_path = os.path.join(run_dir, f"agent-{i}")
-        _run_git(
-            ["worktree", "add", "-b", branch_name, worktree_path],
-            cwd=repo_dir,
-        )
+        if repo is not None:
+            _add_worktree_libgit2(repo_dir, branch_name, worktree_path)
+        else:
+            _run_git(
+                ["worktree", "add", "-b", branch_name, worktree_path],
+                cwd=repo_dir,
+            )
         logger.info("Created worktree %s on branch %s", worktree_path, branch_name)
-        worktrees.append(
-            {
-                "agent_id": i,
-                "branch": branch_name,
-                "worktree_path": worktree_path,
-            }
-        )
+        return {
+            "agent_id": i,
+            "branch": branch_name,
+            "worktree_path": worktree_path,
+        }
+
+    with ThreadPoolExecutor(max_workers=num_agents) as pool:
+        futures = [pool.submit(create_worktree, i) for i in range(num_agents)]
+        # Collect in agent order; re-raises the first failure
+        return [future.result() for future in futures]
+
+
+def _init_repo_libgit2(repo_dir: str, readme: str) -> "pygit2.Repository":
+    """Init the repository and make the initial commit in-process via libgit2."""
+    repo = pygit2.init_repository(repo_dir, initial_head="main")
+    shared = _link_shared_objects(os.path.join(repo_dir, ".git"))
+    if shared is not None:
+        repo.odb.add_disk_alternate(shared)
+    repo.config["user.email"] = GIT_USER_EMAIL
+    repo.config["user.name"] = GIT_USER_NAME
+
+    with open(os.path.join(repo_dir, "README.md"), "w") as f:
+        f.write(readme)
+    repo.index.add("README.md")
+    repo.index.write()
+    tree = repo.index.write_tree()
+    sig = pygit2.Signature(GIT_USER_NAME, GIT_USER_EMAIL)
+    repo.create_commit("HEAD", sig, sig, "Initial commit", tree, [])
+    return repo
+
+
+def _add_worktree_libgit2(repo_dir: str, branch_name: str, worktree_path: str) -> None:
+    """Check out an existing branch into a new worktree.
+
+    Opens its own Repository handle, since libgit2 objects must not be
+    shared between threads.
+    """
+    repo = pygit2.Repository(repo_dir)
+    repo.add_worktree(branch_name, worktree_path, repo.branches.local[branch_name])
 
-    return worktrees
+
+def _link_shared_objects(git_dir: str) -> str | None:
+    """Point the repo at SHARED_OBJECTS_REPO's object store, if one exists.
+
+    Objects already in the shared store are then read from there instead of
+    being written again; worktrees use the same object database, so they
+    benefit too. Returns the shared objects directory when linked.
+    """
+    shared = os.path.join(SHARED_OBJECTS_REPO, "objects")
+    if not os.path.isdir(shared):
+        return None
+    info_dir = os.path.join(git_dir, "objects", "info")
+    os.makedirs(info_dir, exist_ok=True)
+    with open(os.path.join(info_dir, "alternates"), "a") as f:
+        f.write(shared + "\n")
+    return shared
+
+
+def _init_repo_cli(repo_dir: str, readme: str) -> None:
+    """Init the repository and make the initial commit with the git CLI.
+
+    The commit is written with plumbing: one fast-import stream creates the
+    README blob, the tree, the commit and the branch ref, then read-tree
+    syncs the index. Neither scans the working tree like add/commit do.
+    """
+    _run_git(["init", "-b", "main"], cwd=repo_dir)
+    _link_shared_objects(os.path.join(repo_dir, ".git"))
+    _run_git(["config", "user.email", GIT_USER_EMAIL], cwd=repo_dir)
+    _run_git(["config", "user.name", GIT_USER_NAME], cwd=repo_dir)
+
+    with open(os.path.join(repo_dir, "README.md"), "w") as f:
+        f.write(readme)
+    message = "Initial commit\n"
+    stream = (
+        "commit refs/heads/main\n"
+        f"committer {GIT_USER_NAME} <{GIT_USER_EMAIL}> now\n"
+        f"data {len(message.encode())}\n{message}"
+        "M 100644 inline README.md\n"
+        f"data {len(readme.encode())}\n{readme}\n"
+    )
+    _run_git(
+        ["fast-import", "--quiet", "--date-format=now"], cwd=repo_dir, input=stream
+    )
+    _run_git(["read-tree", "HEAD"], cwd=repo_dir)
 
 
 # ---------------------------------------------------------------------------
@@ -109,7 +242,7 @@ def setup_run_repo(group_id: str, num_agents: int) -> list[dict]:
 # ---------------------------------------------------------------------------
 
 @app.post("/api/run")
-async def run_agents(req: RunRequest):
+async def run_agents(req: RunRequest, background_tasks: BackgroundTasks):
     if not req.prompt:
         raise HTTPException(status_code=400, detail="Prompt is required")
     if req.num_agents < 1 or req.num_agents > 10:
@@ -117,92 +250,605 @@ async def run_agents(req: RunRequest):
             status_code=400, detail="Number of agents must be between 1 and 10"
         )
 
-    job_group_id = uuid.uuid4().hex[:8]
+    job_group_id = secrets.token_hex(4)
 
     # --- 1. Create run folder, init git repo, create worktrees ---
+    # Git work blocks on the shared volume, so keep it off the event loop
     try:
-        worktrees = setup_run_repo(job_group_id, req.num_agents)
-    except subprocess.CalledProcessError as exc:
-        logger.error("Git setup failed: %s\nstderr: %s", exc, exc.stderr)
+        worktrees = await asyncio.to_thread(
+            setup_run_repo, job_group_id, req.num_agents
+        )
+    except GIT_ERRORS as exc:
+        stderr = getattr(exc, "stderr", None) or str(exc)
+        logger.error("Git setup failed: %s\nstderr: %s", exc, stderr)
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to set up git worktrees: {exc.stderr}",
+            detail=f"Failed to set up git worktrees: {stderr}",
         )
 
-    # --- 2. Launch one K8s Job per agent, passing worktree info ---
-    job_names = []
-    for wt in worktrees:
-        job_name = f"mcp-worker-{job_group_id}-{wt['agent_id']}"
-        job = _build_job(
-            name=job_name,
-            prompt=req.prompt,
-            agent_id=wt["agent_id"],
-            group_id=job_group_id,
-            branch=wt["branch"],
-            worktree_path=wt["worktree_path"],
-        )
-        batch_v1.create_namespaced_job(namespace=NAMESPACE, body=job)
-        job_names.append(job_name)
+    # --- 2. Launch one indexed K8s Job for all agents, after the response ---
+    # Agent names are fixed up front, so the response needs nothing from the API.
+    job_name = f"mcp-worker-{job_group_id}"
+    job_names = [f"{job_name}-{i}" for i in range(req.num_agents)]
+    background_tasks.add_task(
+        _finalize_run,
+        job_group_id,
+        job_name,
+        worktrees,
+        req.prompt,
+        req.batch_mode,
+        req.quiet,
+    )
 
     return {"job_group_id": job_group_id, "jobs": job_names}
 
 
-@app.get("/api/status/{job_group_id}")
-async def get_status(job_group_id: str):
-    jobs = batch_v1.list_namespaced_job(
-        namespace=NAMESPACE, label_selector=f"job-group={job_group_id}"
+async def _finalize_run(
+    job_group_id: str,
+    job_name: str,
+    worktrees: list[dict],
+    prompt: str,
+    batch_mode: bool,
+    quiet: bool,
+) -> None:
+    """Create the run's Job; runs as a background task after /api/run returns.
+
+    If the apiserver rejects the Job or cannot be reached, the run is
+    recorded as failed so that status polls and streams report it instead
+    of waiting forever.
+    """
+    run_dir = os.path.dirname(worktrees[0]["worktree_path"])
+    job = _build_job(
+        name=job_name,
+        prompt=prompt,
+        group_id=job_group_id,
+        num_agents=len(worktrees),
+        run_dir=run_dir,
+        batch_mode=batch_mode,
+        quiet=quiet,
     )
+    try:
+        await asyncio.to_thread(
+            batch_v1.create_namespaced_job, namespace=NAMESPACE, body=job
+        )
+    except Exception as e:
+        # ApiException for a rejected Job; urllib3 errors when the apiserver
+        # is unreachable
+        logger.exception("Failed to create job %s", job_name)
+        if isinstance(e, client.exceptions.ApiException):
+            error = f"Failed to create job: {e.status} {e.reason}"
+        else:
+            error = f"Failed to create job: {type(e).__name__}: {e}"
+        _record_failed_run(job_group_id, len(worktrees), error)
+        # Other orchestrator replicas find the failure through the shared volume
+        marker = {"num_agents": len(worktrees), "error": error}
+        try:
+            await asyncio.to_thread(
+                _write_file, os.path.join(run_dir, CREATE_ERROR_FILE), marker
+            )
+        except OSError as exc:
+            logger.warning("Could not record job failure for %s: %s", job_name, exc)
+        return
+    logger.info("Created job %s with %d agents", job_name, len(worktrees))
 
-    results = []
-    for job in jobs.items:
-        succeeded = job.status.succeeded or 0
-        failed = job.status.failed or 0
-        active = job.status.active or 0
 
-        if succeeded > 0:
+# ---------------------------------------------------------------------------
+# Job status cache
+# ---------------------------------------------------------------------------
+
+# job-group label -> agent name -> status entry, rebuilt from _JOBS and _PODS
+# by the Job and pod watches
+JOB_CACHE: dict[str, dict[str, dict]] = {}
+# job-group label -> Job, and job-group label -> completion index -> pod
+_JOBS: dict[str, object] = {}
+_PODS: dict[str, dict[int, object]] = {}
+# Guards _JOBS, _PODS and JOB_CACHE writes across the two watch threads
+_cache_lock = threading.Lock()
+COMPLETION_INDEX_KEY = "batch.kubernetes.io/job-completion-index"
+# Pod phase -> agent status; any other phase (Pending, Unknown) is "pending"
+POD_PHASE_STATUS = {"Running": "running", "Succeeded": "completed", "Failed": "failed"}
+# job-group -> status entries of runs whose Job could not be created
+FAILED_RUNS: dict[str, list[dict]] = {}
+# Written to the run directory when the run's Job could not be created
+CREATE_ERROR_FILE = "job-create-error.json"
+WORKER_SELECTOR = "app=mcp-worker"
+WATCH_TIMEOUT_SECONDS = 600
+WATCH_RETRY_SECONDS = 5
+# job-group label -> one event per open status stream, set (on the app's
+# loop) when that group changes
+GROUP_CHANGED: dict[str, set[asyncio.Event]] = {}
+# Resend the current state this often on an idle status stream
+STREAM_KEEPALIVE_SECONDS = 15
+# How long after setup a run without a Job is still treated as being created
+JOB_CREATE_GRACE_SECONDS = 60
+# Advised /api/status poll interval while some agent is running / all pending
+POLL_RUNNING_MS = 1000
+POLL_PENDING_MS = 5000
+_event_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _parse_indexes(indexes: str | None) -> set[int]:
+    """Expand a Job's completed/failed index list, e.g. "0,2-4"."""
+    result: set[int] = set()
+    for part in (indexes or "").split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            result.update(range(int(first), int(last) + 1))
+        elif part:
+            result.add(int(part))
+    return result
+
+
+def _pod_index(pod) -> int | None:
+    index = (pod.metadata.annotations or {}).get(COMPLETION_INDEX_KEY)
+    return int(index) if index is not None else None
+
+
+def _finished_at(pod):
+    """When the pod's container terminated, or None while it has not."""
+    for container in pod.status.container_statuses or []:
+        if container.state and container.state.terminated:
+            return container.state.terminated.finished_at
+    return None
+
+
+def _job_entries(job, pods: dict[int, object]) -> dict[str, dict]:
+    """Summarise an indexed V1Job into one /api/status entry per agent.
+
+    The Job's completed/failed indexes are authoritative; otherwise each
+    agent's state and times come from the pod with its completion index.
+    """
+    completed = _parse_indexes(job.status.completed_indexes)
+    failed = _parse_indexes(job.status.failed_indexes)
+
+    entries = {}
+    for index in range(job.spec.completions or 1):
+        pod = pods.get(index)
+        if index in completed:
             status = "completed"
-        elif failed > 0:
+        elif index in failed:
             status = "failed"
-        elif active > 0:
-            status = "running"
+        elif pod is not None:
+            status = POD_PHASE_STATUS.get(pod.status.phase, "pending")
         else:
             status = "pending"
+        name = f"{job.metadata.name}-{index}"
+        # datetimes are kept as-is; orjson emits them as ISO 8601 strings
+        entries[name] = {
+            "name": name,
+            "status": status,
+            "start_time": pod.status.start_time if pod is not None else None,
+            "completion_time": (
+                _finished_at(pod)
+                if pod is not None and status in ("completed", "failed")
+                else None
+            ),
+        }
+    return entries
+
+
+def _record_failed_run(group_id: str, num_agents: int, error: str) -> list[dict]:
+    """Mark every agent of a run whose Job was never created as failed."""
+    job_name = f"mcp-worker-{group_id}"
+    entries = [
+        {
+            "name": f"{job_name}-{index}",
+            "status": "failed",
+            "start_time": None,
+            "completion_time": None,
+            "error": error,
+        }
+        for index in range(num_agents)
+    ]
+    FAILED_RUNS[group_id] = entries
+    _wake_group(group_id)
+    return entries
+
+
+def _write_file(path: str, data: dict) -> None:
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data))
+
+
+def _probe_run_dir(group_id: str) -> tuple[float | None, dict | None]:
+    """Age in seconds of the run directory (None if absent) and its error marker."""
+    run_dir = _run_dir(group_id)
+    try:
+        age = time.time() - os.stat(run_dir).st_mtime
+    except OSError:
+        return None, None
+    try:
+        with open(os.path.join(run_dir, CREATE_ERROR_FILE), "rb") as f:
+            return age, orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return age, None
+
+
+def _group_of(obj) -> str | None:
+    return (obj.metadata.labels or {}).get("job-group")
+
+
+def _refresh_group(group_id: str) -> None:
+    """Rebuild a group's JOB_CACHE entries from its Job and pods."""
+    with _cache_lock:
+        job = _JOBS.get(group_id)
+        if job is None:
+            JOB_CACHE.pop(group_id, None)
+        else:
+            JOB_CACHE[group_id] = _job_entries(job, _PODS.get(group_id, {}))
+    if _event_loop is not None:
+        _event_loop.call_soon_threadsafe(_wake_group, group_id)
+
+
+def _wake_group(group_id: str) -> None:
+    """Wake the status streams of a group."""
+    for changed in GROUP_CHANGED.get(group_id, ()):
+        changed.set()
+
+
+def _relist_jobs(jobs: list) -> None:
+    fresh = {}
+    for job in jobs:
+        group_id = _group_of(job)
+        if group_id:
+            fresh[group_id] = job
+    with _cache_lock:
+        stale = set(_JOBS) - set(fresh)
+        _JOBS.clear()
+        _JOBS.update(fresh)
+    for group_id in stale | set(fresh):
+        _refresh_group(group_id)
+
+
+def _apply_job(event_type: str, job) -> None:
+    group_id = _group_of(job)
+    if not group_id:
+        return
+    with _cache_lock:
+        if event_type == "DELETED":
+            _JOBS.pop(group_id, None)
+        else:
+            _JOBS[group_id] = job
+    _refresh_group(group_id)
+
+
+def _relist_pods(pods: list) -> None:
+    fresh: dict[str, dict[int, object]] = {}
+    for pod in pods:
+        group_id = _group_of(pod)
+        index = _pod_index(pod)
+        if group_id and index is not None:
+            fresh.setdefault(group_id, {})[index] = pod
+    with _cache_lock:
+        changed = set(_PODS) | set(fresh)
+        _PODS.clear()
+        _PODS.update(fresh)
+    for group_id in changed:
+        _refresh_group(group_id)
+
+
+def _apply_pod(event_type: str, pod) -> None:
+    group_id = _group_of(pod)
+    index = _pod_index(pod)
+    if not group_id or index is None:
+        return
+    with _cache_lock:
+        pods = _PODS.setdefault(group_id, {})
+        if event_type != "DELETED":
+            pods[index] = pod
+        elif index in pods and pods[index].metadata.uid == pod.metadata.uid:
+            # Only if no replacement pod has taken the index since
+            del pods[index]
+        if not pods:
+            del _PODS[group_id]
+    _refresh_group(group_id)
+
+
+def _watch_forever(kind: str, list_fn, relist, apply) -> None:
+    """List then watch mcp-worker objects forever, passing them to the callbacks.
+
+    Runs in a daemon thread. A 410 Gone (resourceVersion too old) triggers a
+    fresh list; any other failure is retried after a short pause.
+    """
+    resource_version = None
+    while True:
+        try:
+            if resource_version is None:
+                listed = list_fn(namespace=NAMESPACE, label_selector=WORKER_SELECTOR)
+                relist(listed.items)
+                resource_version = listed.metadata.resource_version
+
+            for event in watch.Watch().stream(
+                list_fn,
+                namespace=NAMESPACE,
+                label_selector=WORKER_SELECTOR,
+                resource_version=resource_version,
+                timeout_seconds=WATCH_TIMEOUT_SECONDS,
+            ):
+                obj = event["object"]
+                apply(event["type"], obj)
+                resource_version = obj.metadata.resource_version
+        except client.exceptions.ApiException as e:
+            if e.status == 410:
+                logger.info("%s watch expired, relisting", kind)
+                resource_version = None
+                continue
+            logger.warning("%s watch failed: %s", kind, e)
+            time.sleep(WATCH_RETRY_SECONDS)
+        except Exception:
+            logger.exception("%s watch failed", kind)
+            resource_version = None
+            time.sleep(WATCH_RETRY_SECONDS)
+
+
+def _watch_jobs() -> None:
+    _watch_forever("Job", batch_v1.list_namespaced_job, _relist_jobs, _apply_job)
+
+
+def _watch_pods() -> None:
+    _watch_forever("Pod", core_v1.list_namespaced_pod, _relist_pods, _apply_pod)
+
+
+@app.on_event("startup")
+async def start_job_watch():
+    global _event_loop
+    _event_loop = asyncio.get_running_loop()
+    threading.Thread(target=_watch_jobs, name="job-watch", daemon=True).start()
+    threading.Thread(target=_watch_pods, name="pod-watch", daemon=True).start()
+
+
+async def _group_status(job_group_id: str) -> list[dict] | None:
+    """The group's status entries; None if the run is unknown or its Job is gone."""
+    group = JOB_CACHE.get(job_group_id)
+    if group is not None:
+        return sorted(group.values(), key=lambda j: j["name"])
+    failed = FAILED_RUNS.get(job_group_id)
+    if failed is not None:
+        return failed
+    # Not seen by the watch yet (e.g. just created) -- ask the apiserver
+    selector = f"job-group={job_group_id}"
+    jobs, pods = await asyncio.gather(
+        asyncio.to_thread(
+            batch_v1.list_namespaced_job, namespace=NAMESPACE, label_selector=selector
+        ),
+        asyncio.to_thread(
+            core_v1.list_namespaced_pod, namespace=NAMESPACE, label_selector=selector
+        ),
+    )
+    if not jobs.items:
+        age, marker = await asyncio.to_thread(_probe_run_dir, job_group_id)
+        # Job creation may have failed on another replica
+        if marker is not None:
+            return _record_failed_run(
+                job_group_id, marker["num_agents"], marker["error"]
+            )
+        # Past the grace period the id is unknown, or its Job was removed
+        # after ttlSecondsAfterFinished
+        if age is None or age > JOB_CREATE_GRACE_SECONDS:
+            return None
+    by_index = {}
+    for pod in pods.items:
+        index = _pod_index(pod)
+        if index is not None:
+            by_index[index] = pod
+    results = []
+    for job in jobs.items:
+        results.extend(_job_entries(job, by_index).values())
+    return results
 
-        results.append(
-            {
-                "name": job.metadata.name,
-                "status": status,
-                "start_time": (
-                    str(job.status.start_time) if job.status.start_time else None
-                ),
-                "completion_time": (
-                    str(job.status.completion_time)
-                    if job.status.completion_time
-                    else None
-                ),
-            }
-        )
 
-    return {"job_group_id": job_group_id, "jobs": results}
+def _next_poll_ms(results: list[dict]) -> int | None:
+    """How soon a client should poll again; None once every agent finished."""
+    # No Jobs yet means they are being created and will show up shortly
+    if not results or any(j["status"] == "running" for j in results):
+        return POLL_RUNNING_MS
+    if any(j["status"] == "pending" for j in results):
+        return POLL_PENDING_MS
+    return None
+
+
+def _run_not_found(job_group_id: str) -> HTTPException:
+    return HTTPException(status_code=404, detail=f"Run {job_group_id} not found")
+
+
+@app.get("/api/status/{job_group_id}")
+async def get_status(job_group_id: str):
+    results = await _group_status(job_group_id)
+    if results is None:
+        raise _run_not_found(job_group_id)
+    next_poll_ms = _next_poll_ms(results)
+    headers = {}
+    if next_poll_ms is not None:
+        headers["Cache-Control"] = f"max-age={next_poll_ms // 1000}"
+    # Returned as a response directly: orjson encodes it in one pass, without
+    # FastAPI's jsonable_encoder walking the payload first
+    return ORJSONResponse(
+        {"job_group_id": job_group_id, "jobs": results, "next_poll_ms": next_poll_ms},
+        headers=headers,
+    )
+
+
+async def _status_events(job_group_id: str):
+    """Yield the group's status as SSE messages, once now and on each change.
+
+    Ends once every Job has completed or failed, or the run's Job is gone.
+    """
+    changed = asyncio.Event()
+    waiters = GROUP_CHANGED.setdefault(job_group_id, set())
+    waiters.add(changed)
+    try:
+        while True:
+            # Re-arm before reading, so a change in between is not missed
+            changed.clear()
+            results = await _group_status(job_group_id)
+            if results is None:
+                return
+            payload = {"job_group_id": job_group_id, "jobs": results}
+            yield f"data: {orjson.dumps(payload).decode()}\n\n"
+            if results and all(
+                j["status"] in ("completed", "failed") for j in results
+            ):
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), STREAM_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        waiters.discard(changed)
+        if not waiters and GROUP_CHANGED.get(job_group_id) is waiters:
+            del GROUP_CHANGED[job_group_id]
+
+
+@app.get("/api/status/{job_group_id}/stream")
+async def stream_status(job_group_id: str):
+    # Refused up front so EventSource gives up instead of reconnecting
+    if await _group_status(job_group_id) is None:
+        raise _run_not_found(job_group_id)
+    return StreamingResponse(
+        _status_events(job_group_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Pod log cache
+# ---------------------------------------------------------------------------
+
+# Logs of finished Jobs never change: keep them, least recently used first out.
+# Bounded by total log size, well under the orchestrator's memory limit.
+FINISHED_LOGS: OrderedDict[str, list[dict]] = OrderedDict()
+FINISHED_LOGS_MAX_BYTES = 64 * 1024 * 1024
+_finished_logs_bytes = 0
+# Logs of running Jobs are reused for a few seconds to absorb polling bursts
+RECENT_LOGS: dict[str, tuple[float, list[dict]]] = {}
+RECENT_LOGS_TTL = 5.0
+# Read size when streaming a log through /api/results/{job_name}/stream
+LOG_CHUNK_SIZE = 4096
+
+
+def _job_finished(job_name: str, pods) -> bool:
+    """Whether JOB_CACHE has the agent as completed/failed (no per-index retries)."""
+    for pod in pods:
+        group_id = (pod.metadata.labels or {}).get("job-group")
+        entry = JOB_CACHE.get(group_id, {}).get(job_name)
+        if entry is not None:
+            return entry["status"] in ("completed", "failed")
+    return False
+
+
+def _logs_size(logs: list[dict]) -> int:
+    return sum(sys.getsizeof(entry["log"]) for entry in logs)
+
+
+def _cache_logs(job_name: str, logs: list[dict], finished: bool) -> None:
+    global _finished_logs_bytes
+    if finished and not any("error" in entry for entry in logs):
+        RECENT_LOGS.pop(job_name, None)
+        size = _logs_size(logs)
+        if size > FINISHED_LOGS_MAX_BYTES:
+            return
+        old = FINISHED_LOGS.pop(job_name, None)
+        if old is not None:
+            _finished_logs_bytes -= _logs_size(old)
+        FINISHED_LOGS[job_name] = logs
+        _finished_logs_bytes += size
+        while _finished_logs_bytes > FINISHED_LOGS_MAX_BYTES:
+            _, evicted = FINISHED_LOGS.popitem(last=False)
+            _finished_logs_bytes -= _logs_size(evicted)
+        return
+
+    now = time.monotonic()
+    for name, (fetched_at, _) in list(RECENT_LOGS.items()):
+        if now - fetched_at >= RECENT_LOGS_TTL:
+            RECENT_LOGS.pop(name, None)
+    RECENT_LOGS[job_name] = (now, logs)
+
+
+async def _list_agent_pods(job_name: str):
+    """List the pods of one agent, named "<job>-<index>"."""
+    job, _, index = job_name.rpartition("-")
+    return await asyncio.to_thread(
+        core_v1.list_namespaced_pod,
+        namespace=NAMESPACE,
+        label_selector=(
+            f"job-name={job},batch.kubernetes.io/job-completion-index={index}"
+        ),
+    )
 
 
 @app.get("/api/results/{job_name}")
 async def get_results(job_name: str):
-    pods = core_v1.list_namespaced_pod(
-        namespace=NAMESPACE, label_selector=f"job-name={job_name}"
+    """Logs of one agent, named "<job>-<index>" as listed by /api/status."""
+    logs = FINISHED_LOGS.get(job_name)
+    if logs is not None:
+        FINISHED_LOGS.move_to_end(job_name)
+        return ORJSONResponse({"job_name": job_name, "logs": logs})
+
+    recent = RECENT_LOGS.get(job_name)
+    if recent is not None and time.monotonic() - recent[0] < RECENT_LOGS_TTL:
+        return ORJSONResponse({"job_name": job_name, "logs": recent[1]})
+
+    pods = await _list_agent_pods(job_name)
+    # Checked before reading: logs fetched after the Job finished are complete
+    finished = _job_finished(job_name, pods.items)
+
+    fetched = await asyncio.gather(
+        *[
+            asyncio.to_thread(
+                core_v1.read_namespaced_pod_log,
+                name=pod.metadata.name,
+                namespace=NAMESPACE,
+            )
+            for pod in pods.items
+        ],
+        return_exceptions=True,
     )
 
     logs = []
-    for pod in pods.items:
-        try:
-            log = core_v1.read_namespaced_pod_log(
-                name=pod.metadata.name, namespace=NAMESPACE
-            )
+    for pod, log in zip(pods.items, fetched):
+        if isinstance(log, client.exceptions.ApiException):
+            logs.append({"pod": pod.metadata.name, "error": str(log)})
+        elif isinstance(log, BaseException):
+            raise log
+        else:
             logs.append({"pod": pod.metadata.name, "log": log})
-        except client.exceptions.ApiException as e:
-            logs.append({"pod": pod.metadata.name, "error": str(e)})
 
-    return {"job_name": job_name, "logs": logs}
+    _cache_logs(job_name, logs, finished)
+    return ORJSONResponse({"job_name": job_name, "logs": logs})
+
+
+@app.get("/api/results/{job_name}/stream")
+async def stream_results(
+    job_name: str, tail_lines: int | None = None, follow: bool = False
+):
+    """Stream one agent's log as plain text, chunk by chunk from the apiserver.
+
+    Nothing is buffered or cached, so this suits large logs, the last
+    ``tail_lines`` lines, or following a running agent with ``follow``.
+    """
+    pods = await _list_agent_pods(job_name)
+    if not pods.items:
+        raise HTTPException(status_code=404, detail=f"No pod found for {job_name}")
+
+    try:
+        resp = await asyncio.to_thread(
+            core_v1.read_namespaced_pod_log,
+            name=pods.items[-1].metadata.name,
+            namespace=NAMESPACE,
+            tail_lines=tail_lines,
+            follow=follow,
+            _preload_content=False,
+        )
+    except client.exceptions.ApiException as e:
+        raise HTTPException(status_code=e.status or 502, detail=str(e.reason))
+
+    # A sync iterator: Starlette reads it in a worker thread
+    return StreamingResponse(
+        resp.stream(LOG_CHUNK_SIZE),
+        media_type="text/plain",
+        background=BackgroundTask(resp.release_conn),
+    )
 
 
 @app.get("/healthz")
@@ -214,87 +860,154 @@ async def healthz():
 # K8s Job builder
 # ---------------------------------------------------------------------------
 
+# Manifest shared by every MCP worker Job. _build_job() patches the per-agent
+# fields into a copy; plain dicts are sent to the API as-is, skipping the
+# V1* model construction and serialisation.
+_JOB_TEMPLATE: dict = {
+    "apiVersion": "batch/v1",
+    "kind": "Job",
+    "metadata": {
+        "name": None,
+        "namespace": NAMESPACE,
+        "labels": None,
+    },
+    "spec": {
+        "completionMode": "Indexed",
+        "completions": None,
+        "parallelism": None,
+        # A failed agent must not fail or retry the others
+        "backoffLimitPerIndex": 0,
+        "ttlSecondsAfterFinished": 3600,
+        "template": {
+            "metadata": {"labels": None},
+            "spec": {
+                "restartPolicy": "Never",
+                "containers": [
+                    {
+                        "name": "mcp-worker",
+                        "image": MCP_WORKER_IMAGE,
+                        "imagePullPolicy": "IfNotPresent",
+                        "env": [
+                            {"name": "AGENT_PROMPT", "value": None},
+                            {
+                                "name": "AGENT_ID",
+                                "valueFrom": {
+                                    "fieldRef": {
+                                        "fieldPath": "metadata.annotations"
+                                        "['batch.kubernetes.io/job-completion-index']"
+                                    }
+                                },
+                            },
+                            {"name": "JOB_GROUP_ID", "value": None},
+                            # $(AGENT_ID) is expanded by the kubelet per pod
+                            {"name": "AGENT_BRANCH", "value": "agent-$(AGENT_ID)"},
+                            {"name": "AGENT_WORKTREE_PATH", "value": None},
+                            {"name": "AGENT_BATCH_MODE", "value": None},
+                            {"name": "AGENT_QUIET", "value": None},
+                            {
+                                "name": "ANTHROPIC_API_KEY",
+                                "valueFrom": {
+                                    "secretKeyRef": {
+                                        "name": "anthropic-api-key",
+                                        "key": "api-key",
+                                    }
+                                },
+                            },
+                        ],
+                        "volumeMounts": [
+                            {"name": "claude-output", "mountPath": OUTPUT_BASE},
+                        ],
+                        "resources": {
+                            "requests": {"memory": "1Gi", "cpu": "1"},
+                            "limits": {"memory": "2Gi", "cpu": "2"},
+                        },
+                        "securityContext": {
+                            "runAsNonRoot": True,
+                            "runAsUser": 1000,
+                            "allowPrivilegeEscalation": False,
+                        },
+                    }
+                ],
+                "volumes": [
+                    {
+                        "name": "claude-output",
+                        "persistentVolumeClaim": {"claimName": "claude-output-pvc"},
+                    },
+                ],
+            },
+        },
+    },
+}
+
+# A batch-mode pod only submits one Message Batches request and polls it,
+# possibly for hours, so it reserves far less than a live agent session
+BATCH_MODE_RESOURCES = {
+    "requests": {"memory": "128Mi", "cpu": "50m"},
+    "limits": {"memory": "256Mi", "cpu": "250m"},
+}
+
+# Added by _build_job() only when AGENT_RUNNER_ENABLED is set
+_RUNNER_ENV = {
+    "name": "AGENT_RUNNER_SOCKET",
+    "value": f"{AGENT_RUNNER_DIR}/agent.sock",
+}
+_RUNNER_MOUNT = {"name": "agent-runner-socket", "mountPath": AGENT_RUNNER_DIR}
+_RUNNER_VOLUME = {
+    "name": "agent-runner-socket",
+    "hostPath": {"path": AGENT_RUNNER_DIR, "type": "DirectoryOrCreate"},
+}
+
+
 def _build_job(
     name: str,
     prompt: str,
-    agent_id: int,
     group_id: str,
-    branch: str,
-    worktree_path: str,
-) -> client.V1Job:
-    """Build a K8s Job spec for an MCP worker.
-
-    The worker receives the worktree path and branch via env vars so it can:
+    num_agents: int,
+    run_dir: str,
+    batch_mode: bool = False,
+    quiet: bool = False,
+) -> dict:
+    """Build the indexed K8s Job manifest that runs all agents of a run.
+
+    Each pod's completion index is its agent id; the worker receives the
+    matching worktree path and branch via env vars so it can:
     - use the worktree as its working directory
     - commit all changes to the assigned branch when done
-    """
-    container = client.V1Container(
-        name="mcp-worker",
-        image=MCP_WORKER_IMAGE,
-        image_pull_policy="IfNotPresent",
-        env=[
-            client.V1EnvVar(name="AGENT_PROMPT", value=prompt),
-            client.V1EnvVar(name="AGENT_ID", value=str(agent_id)),
-            client.V1EnvVar(name="JOB_GROUP_ID", value=group_id),
-            client.V1EnvVar(name="AGENT_BRANCH", value=branch),
-            client.V1EnvVar(name="AGENT_WORKTREE_PATH", value=worktree_path),
-            client.V1EnvVar(
-                name="ANTHROPIC_API_KEY",
-                value_from=client.V1EnvVarSource(
-                    secret_key_ref=client.V1SecretKeySelector(
-                        name="anthropic-api-key", key="api-key"
-                    )
-                ),
-            ),
-        ],
-        volume_mounts=[
-            client.V1VolumeMount(
-                name="claude-output",
-                mount_path=OUTPUT_BASE,
-            )
-        ],
-        resources=client.V1ResourceRequirements(
-            requests={"memory": "1Gi", "cpu": "1"},
-            limits={"memory": "2Gi", "cpu": "2"},
-        ),
-        security_context=client.V1SecurityContext(
-            run_as_non_root=True,
-            run_as_user=1000,
-            allow_privilege_escalation=False,
-        ),
-    )
-
-    template = client.V1PodTemplateSpec(
-        metadata=client.V1ObjectMeta(
-            labels={"app": "mcp-worker", "job-group": group_id}
-        ),
-        spec=client.V1PodSpec(
-            containers=[container],
-            restart_policy="Never",
-            volumes=[
-                client.V1Volume(
-                    name="claude-output",
-                    persistent_volume_claim=client.V1PersistentVolumeClaimVolumeSource(
-                        claim_name="claude-output-pvc",
-                    ),
-                )
-            ],
-        ),
-    )
 
-    spec = client.V1JobSpec(
-        template=template,
-        backoff_limit=0,
-        ttl_seconds_after_finished=3600,
-    )
-
-    return client.V1Job(
-        api_version="batch/v1",
-        kind="Job",
-        metadata=client.V1ObjectMeta(
-            name=name,
-            namespace=NAMESPACE,
-            labels={"app": "mcp-worker", "job-group": group_id},
-        ),
-        spec=spec,
-    )
+    With AGENT_RUNNER_ENABLED, the node's agent-runner socket directory is
+    mounted so the worker can hand its session to the warm runner.
+    """
+    job = copy.deepcopy(_JOB_TEMPLATE)
+    job["metadata"]["name"] = name
+    # One labels dict serves both the Job and its pods
+    labels = {"app": "mcp-worker", "job-group": group_id}
+    job["metadata"]["labels"] = labels
+    job["spec"]["completions"] = num_agents
+    job["spec"]["parallelism"] = num_agents
+
+    template = job["spec"]["template"]
+    template["metadata"]["labels"] = labels
+    values = {
+        "AGENT_PROMPT": prompt,
+        "JOB_GROUP_ID": group_id,
+        "AGENT_WORKTREE_PATH": os.path.join(run_dir, "agent-$(AGENT_ID)"),
+        "AGENT_BATCH_MODE": "1" if batch_mode else "0",
+        "AGENT_QUIET": "1" if quiet else "0",
+    }
+    container = template["spec"]["containers"][0]
+    for env in container["env"]:
+        if env["name"] in values:
+            env["value"] = values[env["name"]]
+    if batch_mode:
+        container["resources"] = copy.deepcopy(BATCH_MODE_RESOURCES)
+    if SEMANTIC_CACHE_DB:
+        container["env"].append(
+            {"name": "SEMANTIC_CACHE_DB", "value": SEMANTIC_CACHE_DB}
+        )
+        if OLLAMA_URL:
+            container["env"].append({"name": "OLLAMA_URL", "value": OLLAMA_URL})
+    if AGENT_RUNNER_ENABLED:
+        container["env"].append(dict(_RUNNER_ENV))
+        container["volumeMounts"].append(dict(_RUNNER_MOUNT))
+        template["spec"]["volumes"].append(copy.deepcopy(_RUNNER_VOLUME))
+    return job
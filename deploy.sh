@@ -10,6 +10,9 @@ cd "$SCRIPT_DIR"
 # as /mnt/claude-output inside every pod via a hostPath PV.
 HOST_STORAGE_DIR="${HOME}/code/claude-storage"
 
+# Set to 1 to deploy the per-node agent runner and let worker pods use it.
+AGENT_RUNNER_ENABLED="${AGENT_RUNNER_ENABLED:-0}"
+
 # --- Helpers ---
 info()  { echo "[INFO]  $*"; }
 warn()  { echo "[WARN]  $*"; }
@@ -140,6 +143,10 @@ apply_manifests() {
     kubectl apply -f "$SCRIPT_DIR/k8s/backend/orchestrator-rbac.yaml"
     kubectl apply -f "$SCRIPT_DIR/k8s/backend/orchestrator-deployment.yaml"
     kubectl apply -f "$SCRIPT_DIR/k8s/backend/orchestrator-service.yaml"
+    if [ "$AGENT_RUNNER_ENABLED" = "1" ]; then
+        kubectl apply -f "$SCRIPT_DIR/k8s/backend/agent-runner-daemonset.yaml"
+        kubectl set env deployment/orchestrator -n backend AGENT_RUNNER_ENABLED=1
+    fi
     kubectl apply -f "$SCRIPT_DIR/k8s/frontend/deployment.yaml"
     kubectl apply -f "$SCRIPT_DIR/k8s/frontend/service.yaml"
 
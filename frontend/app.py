@@ -1,61 +1,147 @@
 import os
 
-from flask import Flask, render_template, request, jsonify
-import requests as http_requests
+import httpx
+from fastapi import FastAPI
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+)
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
 
-app = Flask(__name__)
+app = FastAPI(title="Multi-Agent Frontend")
 
 ORCHESTRATOR_URL = os.environ.get(
     "ORCHESTRATOR_URL", "http://orchestrator.backend.svc.cluster.local:8080"
 )
+# Must not exceed the orchestrator's limit
+MAX_PROMPT_LENGTH = 64_000
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+
+class RunRequest(BaseModel):
+    prompt: str = ""
+    num_agents: int = 1
+    batch_mode: bool = False
+    quiet: bool = False
+
 
+@app.on_event("startup")
+async def open_client():
+    # One pooled, keep-alive client shared by every proxied call. Calls are
+    # awaited, so a single worker multiplexes all in-flight polls.
+    app.state.client = httpx.AsyncClient(
+        base_url=ORCHESTRATOR_URL,
+        timeout=httpx.Timeout(30.0),
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    )
+    # Relayed streams hold a connection each for as long as a tab is open, so
+    # they get their own uncapped pool and never starve the proxied calls.
+    # No read timeout: a stream may stay idle between updates.
+    app.state.stream_client = httpx.AsyncClient(
+        base_url=ORCHESTRATOR_URL,
+        timeout=httpx.Timeout(10.0, read=None),
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=32),
+    )
 
-@app.route("/")
-def index():
-    return render_template("index.html")
 
+@app.on_event("shutdown")
+async def close_client():
+    await app.state.client.aclose()
+    await app.state.stream_client.aclose()
 
-@app.route("/api/run", methods=["POST"])
-def run():
-    data = request.get_json()
-    prompt = data.get("prompt", "")
-    num_agents = int(data.get("num_agents", 1))
-    if not prompt:
-        return jsonify({"error": "Prompt is required"}), 400
-    if num_agents < 1 or num_agents > 10:
-        return jsonify({"error": "Number of agents must be between 1 and 10"}), 400
+
+async def _proxy(method: str, path: str, timeout: float, **kwargs) -> Response:
     try:
-        resp = http_requests.post(
-            f"{ORCHESTRATOR_URL}/api/run",
-            json={"prompt": prompt, "num_agents": num_agents},
-            timeout=30,
+        resp = await app.state.client.request(method, path, timeout=timeout, **kwargs)
+        headers = {}
+        if "cache-control" in resp.headers:
+            headers["Cache-Control"] = resp.headers["cache-control"]
+        # Pass the orchestrator's JSON body through without decoding it
+        return Response(
+            resp.content,
+            status_code=resp.status_code,
+            media_type=resp.headers.get("content-type", "application/json"),
+            headers=headers,
+        )
+    except httpx.HTTPError as e:
+        return JSONResponse(
+            {"error": f"Failed to contact orchestrator: {str(e)}"}, status_code=502
         )
-        return jsonify(resp.json()), resp.status_code
-    except http_requests.exceptions.RequestException as e:
-        return jsonify({"error": f"Failed to contact orchestrator: {str(e)}"}), 502
 
 
-@app.route("/api/status/<job_group_id>")
-def status(job_group_id):
-    try:
-        resp = http_requests.get(
-            f"{ORCHESTRATOR_URL}/api/status/{job_group_id}", timeout=10
+@app.get("/")
+async def index():
+    return FileResponse(os.path.join(TEMPLATES_DIR, "index.html"))
+
+
+@app.post("/api/run")
+async def run(req: RunRequest):
+    if not req.prompt:
+        return JSONResponse({"error": "Prompt is required"}, status_code=400)
+    if len(req.prompt) > MAX_PROMPT_LENGTH:
+        return JSONResponse(
+            {"error": f"Prompt must be at most {MAX_PROMPT_LENGTH} characters"},
+            status_code=400,
+        )
+    if req.num_agents < 1 or req.num_agents > 10:
+        return JSONResponse(
+            {"error": "Number of agents must be between 1 and 10"}, status_code=400
         )
-        return jsonify(resp.json()), resp.status_code
-    except http_requests.exceptions.RequestException as e:
-        return jsonify({"error": f"Failed to contact orchestrator: {str(e)}"}), 502
+    return await _proxy(
+        "POST",
+        "/api/run",
+        timeout=30,
+        json={
+            "prompt": req.prompt,
+            "num_agents": req.num_agents,
+            "batch_mode": req.batch_mode,
+            "quiet": req.quiet,
+        },
+    )
+
+
+@app.get("/api/status/{job_group_id}")
+async def status(job_group_id: str):
+    return await _proxy("GET", f"/api/status/{job_group_id}", timeout=10)
 
 
-@app.route("/api/results/<job_name>")
-def results(job_name):
+async def _relay_stream(path: str, **params) -> Response:
+    # Relay an orchestrator stream as it arrives
+    client = app.state.stream_client
+    upstream = client.build_request("GET", path, params=params)
     try:
-        resp = http_requests.get(
-            f"{ORCHESTRATOR_URL}/api/results/{job_name}", timeout=10
+        resp = await client.send(upstream, stream=True)
+    except httpx.HTTPError as e:
+        return JSONResponse(
+            {"error": f"Failed to contact orchestrator: {str(e)}"}, status_code=502
         )
-        return jsonify(resp.json()), resp.status_code
-    except http_requests.exceptions.RequestException as e:
-        return jsonify({"error": f"Failed to contact orchestrator: {str(e)}"}), 502
+    return StreamingResponse(
+        resp.aiter_raw(),
+        status_code=resp.status_code,
+        media_type=resp.headers.get("content-type"),
+        headers={"Cache-Control": "no-cache"},
+        background=BackgroundTask(resp.aclose),
+    )
+
+
+@app.get("/api/status/{job_group_id}/stream")
+async def status_stream(job_group_id: str):
+    return await _relay_stream(f"/api/status/{job_group_id}/stream")
+
+
+@app.get("/api/results/{job_name}")
+async def results(job_name: str):
+    return await _proxy("GET", f"/api/results/{job_name}", timeout=10)
 
 
-if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
+@app.get("/api/results/{job_name}/stream")
+async def results_stream(
+    job_name: str, tail_lines: int | None = None, follow: bool = False
+):
+    params: dict = {"follow": follow}
+    if tail_lines is not None:
+        params["tail_lines"] = tail_lines
+    return await _relay_stream(f"/api/results/{job_name}/stream", **params)